@@ -20,7 +20,7 @@ def run(force_bitbang=False):
         tree.show_test_pattern()
         # Turn a single pixel white for 2s
         tree[0].color = (1.0, 1.0, 1.0)
-        tree.value = tree.value
+        tree.show()
         time.sleep(2)
         tree.off()
     finally:
@@ -12,9 +12,8 @@ supports `force_bitbang` for PIO troubleshooting and `debug` to print diagnostic
 output to the REPL.
 """
 
-from tree_pico import RGBXmasTree
+from tree_pico import RGBXmasTree, hsv_to_rgb_bytes
 import time
-import math
 try:
     import random
 except Exception:
@@ -25,34 +24,12 @@ except Exception:
         random = None
 
 
-def hsv_to_rgb(h, s, v):
-    i = int(h * 6.0)
-    f = (h * 6.0) - i
-    p = v * (1.0 - s)
-    q = v * (1.0 - s * f)
-    t = v * (1.0 - s * (1.0 - f))
-    i = i % 6
-    if i == 0:
-        r, g, b = v, t, p
-    elif i == 1:
-        r, g, b = q, v, p
-    elif i == 2:
-        r, g, b = p, v, t
-    elif i == 3:
-        r, g, b = p, q, v
-    elif i == 4:
-        r, g, b = t, p, v
-    else:
-        r, g, b = v, p, q
-    return (r, g, b)
-
-
 def hue_cycle(tree, duration=10.0, step_delay=0.05):
     start = time.time()
     hue = 0.0
     while time.time() - start < duration:
-        c = hsv_to_rgb(hue % 1.0, 1.0, 0.6)
-        tree.color = c
+        r, g, b = hsv_to_rgb_bytes(hue % 1.0, 1.0, 0.6)
+        tree.set_bytes_all(r, g, b)
         hue += 0.0025
         time.sleep(step_delay)
 
@@ -65,7 +42,7 @@ def one_by_one(tree, duration=10.0, colors=None, delay=0.05):
         for color in colors:
             for pixel in tree:
                 pixel.color = color
-                tree.value = tree.value
+                tree.show()
                 time.sleep(delay)
                 if time.time() - start >= duration:
                     break
@@ -96,7 +73,7 @@ def random_sparkles(tree, duration=10.0, delay=0.1):
         idx = rmod.randint(0, len(tree) - 1)
         color = (rmod.random(), rmod.random(), rmod.random())
         tree[idx].color = color
-        tree.value = tree.value
+        tree.show()
         time.sleep(delay)
 
 
@@ -23,6 +23,7 @@ try:
         for color in colors:
             for pixel in tree:
                 pixel.color = color
+                tree.show()
                 # small pacing delay so the visual effect is visible
                 time.sleep(0.05)
 except KeyboardInterrupt:
@@ -14,19 +14,15 @@ except Exception:
     import urandom as random
 
 tree = RGBXmasTree(pixels=25, data_pin=9, clock_pin=28, debug=True)
-
-def random_color():
-    r = random.random()
-    g = random.random()
-    b = random.random()
-    return (r, g, b)
+last = len(tree) - 1
 
 try:
     while True:
-        pixel = random.choice(tree)
-        pixel.color = random_color()
+        # integer colour channels avoid float maths on the Pico
+        idx = random.randint(0, last)
+        tree.set_pixel_fast(idx, random.getrandbits(8), random.getrandbits(8), random.getrandbits(8))
         # commit the new values to the LEDs
-        tree.value = tree.value
+        tree.show()
         # short delay so the effect is visible
         time.sleep(0.1)
 except KeyboardInterrupt:
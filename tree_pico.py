@@ -15,13 +15,56 @@ except Exception:
 
 try:
     from machine import Pin
-    from machine import mem32
 except Exception:
     # if not running on MicroPython, define minimal mock classes so static analysis works
     Pin = None
 
+try:
+    import micropython
+    from micropython import const
+except ImportError:
+    # CPython has no native/viper code emitters; make the decorators no-ops so the module imports
+    class micropython:
+        @staticmethod
+        def native(f):
+            return f
+
+        viper = native
+
+    def const(x):
+        return x
+
+try:
+    import uctypes
+except ImportError:
+    uctypes = None
+
+from array import array
 import time
 
+# RP2040 SIO registers used by the viper bit-bang path (atomic set/clear of GPIO outputs)
+SIO_BASE = 0xD0000000
+GPIO_OUT_SET = SIO_BASE + 0x14
+GPIO_OUT_CLR = SIO_BASE + 0x18
+
+# PIO TX FIFO registers used as the DMA write target (TXF0..TXF3 follow at 4-byte steps)
+PIO0_BASE = 0x50200000
+PIO1_BASE = 0x50300000
+PIO_TXF0 = 0x10
+
+# Top three bits of every APA102 pixel's brightness byte are always set
+_BR_MASK = const(0xE0)
+
+# Words the state machine can still hold once put()/DMA has finished: 4 TX FIFO entries + OSR
+_FIFO_WORDS = const(5)
+
+
+def _byte_view(words, length):
+    # Writable byte view over an array('I') without copying it
+    if uctypes:
+        return uctypes.bytearray_at(uctypes.addressof(words), length)
+    return memoryview(words).cast('B')
+
 
 # Lightweight Color class to provide similar usage to colorzero.Color for convenience
 class Color(tuple):
@@ -34,6 +77,31 @@ class Color(tuple):
         return super().__new__(cls, (float(r), float(g), float(b)))
 
 
+# Per-sector (r, g, b) selectors into (v, p, q, t) for hsv_to_rgb
+_HSV_SECTORS = ((0, 3, 1), (2, 0, 1), (1, 0, 3), (1, 2, 0), (3, 1, 0), (0, 1, 2))
+
+
+@micropython.native
+def hsv_to_rgb(h, s, v, _sectors=_HSV_SECTORS):
+    """Convert HSV (each in [0,1]) to an (r, g, b) float tuple.
+
+    Uses a sector lookup table rather than an if/elif chain, as colorzero may not be
+    available under MicroPython.
+    """
+    i = int(h * 6.0)  # sector 0..5
+    f = (h * 6.0) - i
+    ch = (v, v * (1.0 - s), v * (1.0 - s * f), v * (1.0 - s * (1.0 - f)))
+    sel = _sectors[i % 6]
+    return (ch[sel[0]], ch[sel[1]], ch[sel[2]])
+
+
+@micropython.native
+def hsv_to_rgb_bytes(h, s, v, _hsv=hsv_to_rgb, _int=int):
+    """Like hsv_to_rgb but returns (r, g, b) as ints 0-255, for RGBXmasTree.set_bytes_all()."""
+    r, g, b = _hsv(h, s, v)
+    return (_int(r * 255), _int(g * 255), _int(b * 255))
+
+
 class Pixel:
     def __init__(self, parent, index):
         self.parent = parent
@@ -41,17 +109,21 @@ class Pixel:
 
     @property
     def value(self):
-        return self.parent.value[self.index]
+        return self.parent._values()[self.index]
 
     @value.setter
     def value(self, value):
-        new_parent_value = list(self.parent.value)
-        new_parent_value[self.index] = value
-        self.parent.value = tuple(new_parent_value)
+        # Update only this pixel's entry and frame bytes; call parent.show() to send
+        r, g, b = value
+        parent = self.parent
+        parent._values()[self.index] = (float(r), float(g), float(b))
+        parent._pack_pixel(self.index, r, g, b)
+        parent._dirty = True
 
     @property
     def color(self):
-        return Color(*self.value)
+        # The stored (r, g, b) tuple is already floats; no need to wrap it in a new Color
+        return self.parent._values()[self.index]
 
     @color.setter
     def color(self, c):
@@ -72,45 +144,65 @@ if PIO_AVAILABLE:
     # Attempt to use sideset_count (modern MicroPython). If not supported, fall back
     # to an alternate PIO program using `set(pins, x)` for clock toggling.
     try:
-        @rp2.asm_pio(sideset_init=rp2.PIO.OUT_LOW, sideset_count=1, out_init=rp2.PIO.OUT_LOW, out_shiftdir=rp2.PIO.SHIFT_LEFT, autopull=True, pull_thresh=8)
+        @rp2.asm_pio(sideset_init=rp2.PIO.OUT_LOW, sideset_count=1, out_init=rp2.PIO.OUT_LOW, out_shiftdir=rp2.PIO.SHIFT_LEFT, autopull=True, pull_thresh=32)
         def _apa102_pio():
             """
             Contemporary PIO program that uses sideset for clock toggling.
+            Two cycles per bit with no jmp (wrap is free), so the bit rate is freq / 2.
             """
-            label('bitloop')
+            wrap_target()
             out(pins, 1)         .side(0)   # set data bit, clock low
-            nop()                .side(1)   # clock high
-            nop()                .side(0)   # clock low
-            jmp('bitloop')                # repeat
+            nop()                .side(1)   # clock high: strip samples data on rising edge
+            wrap()
         PIO_PGM_WITH_SIDSET = True
     except TypeError:
         # Fallback for older MicroPython versions that don't support sideset_count in decorator.
         PIO_AVAILABLE = True
-        @rp2.asm_pio(out_init=rp2.PIO.OUT_LOW, out_shiftdir=rp2.PIO.SHIFT_LEFT, autopull=True, pull_thresh=8)
+        @rp2.asm_pio(out_init=rp2.PIO.OUT_LOW, set_init=rp2.PIO.OUT_LOW, out_shiftdir=rp2.PIO.SHIFT_LEFT, autopull=True, pull_thresh=32)
         def _apa102_pio_alt():
             """
             Fallback PIO program that writes data via OUT (out_base, data pin) and toggles
             the clock pin via SET (set_base). This requires providing `set_base` when creating
-            the StateMachine.
+            the StateMachine. Three cycles per bit, so the bit rate is freq / 3.
             """
-            label('bitloop')
-            out(pins, 1)         # set data bit (out_base)
+            wrap_target()
+            out(pins, 1)         # set data bit (out_base), clock already low
             set(pins, 1)         # set clock high (set_base)
-            nop()
             set(pins, 0)         # set clock low (set_base)
-            nop()
-            jmp('bitloop')
-            PIO_PGM_WITH_SET = True
+            wrap()
+        PIO_PGM_WITH_SET = True
         # end of PIO program selection
 
 
 class RGBXmasTree:
-    def __init__(self, pixels=25, brightness=0.5, data_pin=9, clock_pin=28, sm_id=0, pio_freq=2_000_000, force_bitbang=False, debug=False):
+    def __init__(self, pixels=25, brightness=0.5, data_pin=9, clock_pin=28, sm_id=0, pio_freq=24_000_000, force_bitbang=False, debug=False):
         self._pixels = int(pixels)
         self._value = [(0.0, 0.0, 0.0)] * self._pixels
         self._brightness = float(brightness)
         self._brightness_bits = int(self._brightness * 31) & 0x1F
 
+        # Preallocated APA102 frame: 4-byte start frame, 4 bytes per pixel, then end frame.
+        # The end frame needs (pixels / 2) extra clock edges; zeros work on most strips, plus
+        # a few extra 0x00 bytes for safety. Start and end bytes stay zero forever.
+        # The frame is held as 32-bit words (one per pixel) so the PIO pulls a whole pixel per
+        # FIFO entry. Words shift out MSB first and the RP2040 is little-endian, so in memory
+        # each pixel's bytes are reversed: R G B brightness, sent as brightness B G R.
+        # The end frame gets _FIFO_WORDS more zero words so that only padding can still be
+        # queued in the state machine when a send returns.
+        frame_len = 4 + 4 * self._pixels + ((self._pixels + 15) // 16) + 4
+        self._frame_len = (frame_len + 3) // 4 * 4 + 4 * _FIFO_WORDS
+        self._frame32 = array('I', [0] * (self._frame_len // 4))
+        # Byte view aliasing the same memory, used for per-byte updates
+        self._frame = _byte_view(self._frame32, self._frame_len)
+        self._dirty = False
+        # Snapshot of the last frame sent. show() compares against it to skip frames the strip
+        # already displays, and transmits from it so setters can keep writing _frame32 while
+        # a DMA transfer is still reading the previous frame.
+        # A 0xFF first byte never matches the all-zero start frame, forcing the next send.
+        self._last32 = array('I', [0] * (self._frame_len // 4))
+        self._last_frame = _byte_view(self._last32, self._frame_len)
+        self._last_frame[0] = 0xFF
+
         self.data_pin = int(data_pin)
         self.clock_pin = int(clock_pin)
 
@@ -118,6 +210,7 @@ class RGBXmasTree:
         self._use_pio = PIO_AVAILABLE and not force_bitbang
         self._debug = bool(debug)
         self._sm = None
+        self._dma = None
         self._sm_id = sm_id
         self._pio_freq = int(pio_freq)
 
@@ -141,13 +234,33 @@ class RGBXmasTree:
                     print('PIO init failed, falling back to bitbang:', e)
                 self._use_pio = False
                 self._sm = None
+        if self._use_pio and hasattr(rp2, 'DMA'):
+            # Let a DMA channel feed the TX FIFO so show() returns while the frame is still
+            # going out. Older firmware without rp2.DMA keeps using blocking sm.put().
+            try:
+                pio, sm = divmod(self._sm_id, 4)
+                self._dma = rp2.DMA()
+                # DREQ_PIOx_TXy = 8 * x + y paces transfers to FIFO space
+                self._dma_ctrl = self._dma.pack_ctrl(size=2, inc_read=True, inc_write=False, treq_sel=8 * pio + sm)
+                self._dma_write = (PIO1_BASE if pio else PIO0_BASE) + PIO_TXF0 + 4 * sm
+            except Exception as e:
+                if self._debug:
+                    print('DMA init failed, using blocking put:', e)
+                if self._dma:
+                    self._dma.close()
+                self._dma = None
         if self._debug:
-            print('RGBXmasTree: pixels=%d, data_pin=%d, clock_pin=%d, pio=%s, sm_id=%s' % (self._pixels, self.data_pin, self.clock_pin, self._use_pio, self._sm_id))
+            print('RGBXmasTree: pixels=%d, data_pin=%d, clock_pin=%d, pio=%s, sm_id=%s, dma=%s' % (self._pixels, self.data_pin, self.clock_pin, self._use_pio, self._sm_id, self._dma is not None))
 
         if not self._use_pio:
             # Use bitbang pins as fallback
             self._clk = Pin(self.clock_pin, Pin.OUT)
             self._din = Pin(self.data_pin, Pin.OUT)
+            # Plain ints so the viper writer never has to look anything up per bit
+            self._gpio_set = GPIO_OUT_SET
+            self._gpio_clr = GPIO_OUT_CLR
+            self._clk_mask = 1 << self.clock_pin
+            self._din_mask = 1 << self.data_pin
 
         self.off()
 
@@ -162,15 +275,25 @@ class RGBXmasTree:
 
     @property
     def color(self):
-        average_r = sum(pixel.color[0] for pixel in self) / len(self)
-        average_g = sum(pixel.color[1] for pixel in self) / len(self)
-        average_b = sum(pixel.color[2] for pixel in self) / len(self)
-        return Color(average_r, average_g, average_b)
+        # Average colour of all pixels, accumulated in one pass over the pixel buffer
+        sum_r = sum_g = sum_b = 0.0
+        for r, g, b in self._values():
+            sum_r += r
+            sum_g += g
+            sum_b += b
+        n = self._pixels
+        return Color(sum_r / n, sum_g / n, sum_b / n)
 
     @color.setter
     def color(self, c):
+        # Every pixel is the same colour: scale it once and fill the frame, skipping the
+        # per-pixel conversion and length check done by the value setter
         r, g, b = c
-        self.value = ((r, g, b),) * len(self)
+        c = (float(r), float(g), float(b))
+        self._fill(_BR_MASK | self._brightness_bits, int(255 * b) & 0xFF, int(255 * g) & 0xFF, int(255 * r) & 0xFF)
+        self._value = [c] * self._pixels
+        self._dirty = True
+        self.show()
 
     @property
     def brightness(self):
@@ -181,12 +304,14 @@ class RGBXmasTree:
         max_brightness = 31
         self._brightness_bits = int(brightness * max_brightness) & 0x1F
         self._brightness = brightness
-        # force a refresh of current values to apply the brightness
-        self.value = self.value
+        # Only the brightness byte of each pixel changes; patch those and resend
+        self._patch_brightness(_BR_MASK | self._brightness_bits)
+        self._dirty = True
+        self.show()
 
     @property
     def value(self):
-        return self._value
+        return tuple(self._values())
 
     @value.setter
     def value(self, value):
@@ -195,46 +320,188 @@ class RGBXmasTree:
         if len(pixels) != self._pixels:
             raise ValueError("value must contain exactly {} pixels".format(self._pixels))
 
-        # Build frame
-        start_frame = bytearray([0x00, 0x00, 0x00, 0x00])
-        brightness_byte = 0b11100000 | self._brightness_bits
-        body = bytearray()
-        for r, g, b in pixels:
-            br = [int(255 * v) & 0xFF for v in (b, g, r)]  # Order: B G R
-            body.extend(bytes([brightness_byte]))
-            body.extend(bytes(br))
+        self._pack(pixels, self._frame, _BR_MASK | self._brightness_bits)
+        self._value = pixels
+        self._dirty = True
+        self.show()
 
-        # End frame based on pixel count: send enough clock cycles by sending 0x00 or 0xFF
-        # Some APA102 implementations send 0's, some send ones. We'll use zeros (works in many cases),
-        # plus a few extra 0x00 frames for safety.
-        end_len = (self._pixels + 15) // 16
-        end_frame = bytearray([0x00] * (end_len + 4))
+    def set_bytes(self, rgb_bytes):
+        """Set every pixel from a bytes-like of length 3 * pixels holding r, g, b ints 0-255.
 
-        frame = start_frame + body + end_frame
+        Integer counterpart to the value setter: the bytes are copied straight into the
+        frame with no float scaling, and the frame is sent immediately.
+        """
+        if len(rgb_bytes) != 3 * self._pixels:
+            raise ValueError("rgb_bytes must contain exactly {} bytes".format(3 * self._pixels))
+        self._copy_rgb(rgb_bytes)
+        self._value = None
+        self._dirty = True
+        self.show()
+
+    def set_bytes_all(self, r, g, b):
+        """Set the whole tree to one colour given as ints 0-255 and send it immediately."""
+        self._fill(_BR_MASK | self._brightness_bits, b & 0xFF, g & 0xFF, r & 0xFF)
+        self._value = None
+        self._dirty = True
+        self.show()
+
+    def set_pixel_fast(self, index, r, g, b):
+        """Set one pixel from ints 0-255 by writing its frame bytes directly.
+
+        Like assigning a Pixel's value, the change is only sent by the next show().
+        Negative indexes count from the end, as with tree[index].
+        """
+        if index < 0:
+            index += self._pixels
+        if not 0 <= index < self._pixels:
+            raise IndexError("pixel index out of range")
+        out = self._frame
+        off = 4 + 4 * index
+        out[off] = r & 0xFF
+        out[off + 1] = g & 0xFF
+        out[off + 2] = b & 0xFF
+        self._value = None
+        self._dirty = True
+
+    def show(self):
+        """Send the pixel buffer to the strip if it has changed since the last show().
+
+        Whole-tree updates (value, color, on, off) show immediately; per-pixel updates
+        only modify the buffer so several can be batched into one transmission.
+        When rp2.DMA is available the frame is sent in the background and show() returns
+        straight away; the next show() waits for that transfer to finish first.
+        A frame identical to the last one sent (e.g. a colour that quantises to the same
+        bytes) is skipped.
+        """
+        if not self._dirty:
+            return
+        self._dirty = False
+        if self._frame == self._last_frame:
+            return
+        # The snapshot may still be going out by DMA; let that finish before overwriting it
+        self._wait_dma()
+        self._last_frame[:] = self._frame
+        self._write_frame()
+
+    @micropython.native
+    def _pack(self, pixels, out, bb):
+        # Scale float (r,g,b) triples into the pixel section of the frame
+        off = 4
+        for r, g, b in pixels:
+            out[off] = int(r * 255.0) & 0xFF
+            out[off + 1] = int(g * 255.0) & 0xFF
+            out[off + 2] = int(b * 255.0) & 0xFF
+            out[off + 3] = bb
+            off += 4
+
+    @micropython.native
+    def _pack_pixel(self, index, r, g, b, _int=int):
+        # Scale one float (r,g,b) triple into its 4 bytes of the frame
+        out = self._frame
+        off = 4 + 4 * index
+        out[off] = _int(255 * r) & 0xFF
+        out[off + 1] = _int(255 * g) & 0xFF
+        out[off + 2] = _int(255 * b) & 0xFF
+        out[off + 3] = _BR_MASK | self._brightness_bits
+
+    @micropython.native
+    def _fill(self, bb, b, g, r):
+        # Write the same pre-scaled pixel into every slot of the frame
+        out = self._frame
+        end = 4 + 4 * self._pixels
+        for off in range(4, end, 4):
+            out[off] = r
+            out[off + 1] = g
+            out[off + 2] = b
+            out[off + 3] = bb
+
+    @micropython.viper
+    def _copy_rgb(self, rgb_bytes):
+        # Copy packed r, g, b bytes into the frame, adding the brightness byte to each pixel
+        src = ptr8(rgb_bytes)
+        out = ptr8(self._frame)
+        bb = int(self._brightness_bits) | _BR_MASK
+        n = int(self._pixels)
+        for i in range(n):
+            off = 4 + 4 * i
+            j = 3 * i
+            out[off] = src[j]
+            out[off + 1] = src[j + 1]
+            out[off + 2] = src[j + 2]
+            out[off + 3] = bb
+
+    def _values(self):
+        # Internal mutable pixel list, updated in place by Pixel. After set_bytes(),
+        # set_bytes_all() or set_pixel_fast() it is rebuilt from the frame on demand.
+        if self._value is None:
+            self._value = self._unpack()
+        return self._value
 
-        # Send bytes via PIO or bitbang
+    def _unpack(self):
+        # Recover float (r,g,b) tuples from the frame bytes (quantised to 1/255)
+        frame = self._frame
+        return [(frame[off] / 255, frame[off + 1] / 255, frame[off + 2] / 255) for off in range(4, 4 + 4 * self._pixels, 4)]
+
+    @micropython.viper
+    def _patch_brightness(self, bb: int):
+        # Overwrite the global brightness byte of every pixel, leaving the colours untouched
+        out = ptr8(self._frame)
+        end = 4 + 4 * int(self._pixels)
+        off = 7
+        while off < end:
+            out[off] = bb
+            off += 4
+
+    def _write_frame(self):
+        # Send the snapshot taken by show() via PIO or bitbang
         if self._use_pio and self._sm:
-            for b in frame:
-                self._sm.put(int(b))
+            if self._dma:
+                # Kick off the transfer and return; the next frame's work overlaps with it
+                self._dma.config(read=self._last32, write=self._dma_write, count=len(self._last32), ctrl=self._dma_ctrl, trigger=True)
+            else:
+                # Stream the whole frame into the TX FIFO, one 32-bit word (pixel) per entry
+                self._sm.put(self._last32)
         else:
             # Bitbang fallback
-            self._bitbang_write(frame)
+            self._bitbang_write(self._last_frame)
+
+    def _wait_dma(self):
+        # Block until the previous frame has been handed to the FIFO (a few tens of us)
+        if self._dma:
+            while self._dma.active():
+                pass
 
-        self._value = tuple(pixels)
+    def _drain(self):
+        # Wait until the state machine has shifted out everything queued, so it can be
+        # stopped without truncating a frame
+        self._wait_dma()
+        if self._sm:
+            while self._sm.tx_fifo():
+                pass
+            # The OSR can still hold one word: 32 bits at up to 3 PIO cycles per bit
+            time.sleep_us(96_000_000 // self._pio_freq + 1)
 
+    @micropython.viper
     def _bitbang_write(self, data):
-        # Basic software SPI - toggles clock & data pins using Pin and small delay.
-        # Timing may be slower than PIO state machine but will work for many APA102 LED strips.
-        for byte in data:
-            for bit in range(7, -1, -1):  # MSB first
-                bit_val = (byte >> bit) & 1
-                self._din.value(bit_val)
-                # Toggle clock high then low
-                self._clk.value(1)
-                # Short tiny delay - microsecond sleep
-                time.sleep_us(1)
-                self._clk.value(0)
-                time.sleep_us(1)
+        # Software SPI writing straight to the SIO set/clear registers. APA102 samples on the
+        # rising clock edge and has no minimum pulse width at these rates, so no delays needed.
+        buf = ptr8(data)
+        n = int(len(data))
+        set_reg = ptr32(int(self._gpio_set))
+        clr_reg = ptr32(int(self._gpio_clr))
+        clk_mask = int(self._clk_mask)
+        din_mask = int(self._din_mask)
+        for i in range(n):
+            byte = buf[i ^ 3]  # bytes are stored reversed within each 32-bit word
+            bit = 7
+            while bit >= 0:  # MSB first
+                if (byte >> bit) & 1:
+                    set_reg[0] = din_mask
+                else:
+                    clr_reg[0] = din_mask
+                set_reg[0] = clk_mask
+                clr_reg[0] = clk_mask
+                bit -= 1
         if self._debug:
             print('bitbang write %d bytes' % len(data))
 
@@ -242,6 +509,7 @@ class RGBXmasTree:
         """Toggle clock and data lines to validate wiring. Use this to confirm pins are connected and toggling."""
         # If there's a PIO state machine active, stop it while testing pins
         sm_was_active = False
+        self._drain()
         if self._sm:
             try:
                 sm_was_active = bool(self._sm.active())
@@ -277,6 +545,8 @@ class RGBXmasTree:
                 self._sm.active(1)
             except Exception:
                 pass
+        # the strip may have latched garbage; make the next show() resend
+        self._last_frame[0] = 0xFF
 
     def show_test_pattern(self):
         """Send a simple pattern (red, green, blue) to the start of the strip to verify mapping.
@@ -314,6 +584,7 @@ class RGBXmasTree:
 
         # Make sure PIO is not driving these pins
         sm_was_active = False
+        self._drain()
         if self._sm:
             try:
                 sm_was_active = bool(self._sm.active())
@@ -372,16 +643,22 @@ class RGBXmasTree:
                 self._sm.active(1)
             except Exception:
                 pass
+        # the strip may have latched garbage; make the next show() resend
+        self._last_frame[0] = 0xFF
 
         print('check_pin_drive results:', results)
 
     def on(self):
-        self.value = ((1, 1, 1),) * len(self)
+        self.color = (1, 1, 1)
 
     def off(self):
-        self.value = ((0, 0, 0),) * len(self)
+        self.color = (0, 0, 0)
 
     def close(self):
+        self._drain()
+        if self._dma:
+            self._dma.close()
+            self._dma = None
         if self._sm:
             try:
                 self._sm.active(0)
@@ -400,7 +677,7 @@ if __name__ == '__main__':
     tree[1].color = (0.0, 1.0, 0.0)  # next green
     tree[2].color = (0.0, 0.0, 1.0)  # next blue
     # commit
-    tree.value = tree.value
+    tree.show()
     time.sleep(5)
     tree.off()
     tree.close()